@@ -1,4 +1,15 @@
+from typing import Any
+
 from .main import main
-from . import trayicon
 
 __all__ = ['main', 'trayicon']
+
+
+def __getattr__(name: str) -> Any:
+    # trayicon pulls in PyQt6, so it's only imported when first needed.
+    # In GUI mode main() starts that import in the background during startup.
+    if name == "trayicon":
+        from . import trayicon
+
+        return trayicon
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
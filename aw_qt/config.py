@@ -1,7 +1,7 @@
 import logging
-import json
 import os
-from pathlib import Path
+import socket
+from functools import lru_cache
 from typing import List, Any, Optional
 
 from aw_core.config import load_config_toml
@@ -17,8 +17,36 @@ autostart_modules = ["aw-server", "aw-watcher-window"]
 autostart_modules = ["aw-server", "aw-watcher-window"]
 """.strip()
 
+# Shared HTTP session, so token requests to aw-server reuse keep-alive connections
+_session: Optional[Any] = None
+
+
+def get_session() -> Any:
+    """Returns the requests.Session shared by everything that talks to aw-server"""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _session = requests.Session()
+        _session.mount(
+            "http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        )
+    return _session
+
 
 class AwQtSettings:
+    __slots__ = (
+        "testing",
+        "autostart_modules",
+        "auth_token",
+        "api_url",
+        "is_authenticated",
+        "_auth_loaded",
+        "_port",
+        "_token_endpoint",
+    )
+
     def __init__(self, testing: bool):
         """
         An instance of loaded settings, containing a list of modules to autostart.
@@ -27,6 +55,9 @@ class AwQtSettings:
         config = load_config_toml("aw-qt", default_config)
         config_section: Any = config["aw-qt" if not testing else "aw-qt-testing"]
 
+        self.testing = testing
+        self._port = 5666 if testing else 5600
+        self._token_endpoint = f"http://localhost:{self._port}/api/0/token"
         self.autostart_modules: List[str] = config_section["autostart_modules"]
         
         # Authentication settings
@@ -34,61 +65,88 @@ class AwQtSettings:
         self.api_url: Optional[str] = None
         self.is_authenticated: bool = False
         
-        # Load authentication data if it exists
-        self._load_auth_data()
+        # Fetched from aw-server on first access (or by the trayicon in the background)
+        self._auth_loaded = False
     
     
-    def _load_auth_data(self) -> None:
-        """Load authentication data from aw-server SQLite storage."""
+    def _load_auth_data(self) -> bool:
+        """
+        Load authentication data from aw-server SQLite storage.
+
+        Returns False if aw-server couldn't be asked, so the load should be retried later.
+        """
+        # Probe the port first, so a server that isn't up fails fast instead of on the HTTP timeout
         try:
-            import requests
-            server_url = f"http://localhost:{5666 if self.testing else 5600}"
-            response = requests.get(f"{server_url}/api/0/token", timeout=2)
+            socket.create_connection(("localhost", self._port), timeout=0.05).close()
+        except OSError:
+            # aw-server may still be starting up (it's autostarted right before the trayicon)
+            logger.info("ℹ️ aw-server not reachable yet - authentication not loaded")
+            return False
+
+        try:
+            response = get_session().get(self._token_endpoint, timeout=2)
             if response.status_code == 200:
                 data = response.json()
                 token = data.get('token')
                 url = data.get('url')
                 if token and url:
+                    # A login/logout saved while this request was in flight is newer, keep it
+                    if self._auth_loaded:
+                        return True
                     self.auth_token = token
                     self.api_url = url
                     self.is_authenticated = True
-                    logger.info(f"🔐 Loaded authentication data from aw-server SQLite")
-                    logger.info(f"   🔑 Token: {token[:20]}...{token[-10:] if len(token) > 30 else ''}")
-                    logger.info(f"   🌐 API URL: {url}")
-                    return
+                    logger.info("🔐 Loaded authentication data from aw-server SQLite")
+                    logger.debug("   🔑 Token length: %d characters", len(token))
+                    logger.info("   🌐 API URL: %s", url)
+                    return True
             
             logger.info("ℹ️ No authentication data found - user not authenticated")
+            return True
 
         except Exception as e:
-            logger.debug(f"Could not load from aw-server: {e}")
-            logger.info("ℹ️ No authentication data found - user not authenticated")
+            logger.debug("Could not load from aw-server: %s", e)
+            logger.info("ℹ️ Could not reach aw-server - authentication not loaded yet")
+            return False
+
+    def ensure_auth_loaded(self) -> bool:
+        """
+        Fetches the authentication data from aw-server unless that already succeeded.
+
+        This is a blocking HTTP request, so the GUI should call it off the main thread.
+        Returns whether the data is loaded.
+        """
+        if not self._auth_loaded and self._load_auth_data():
+            self._auth_loaded = True
+        return self._auth_loaded
     
     def save_auth_data(self, token: str, api_url: str) -> bool:
         """Save authentication data to aw-server SQLite storage."""
+        if self.is_authenticated and token == self.auth_token and api_url == self.api_url:
+            logger.debug("Authentication data unchanged, skipping save")
+            return True
         try:
-            logger.info(f"💾 Saving authentication data:")
-            logger.info(f"   🔑 Token: {token[:20]}...{token[-10:] if len(token) > 30 else ''}")
-            logger.info(f"   🌐 API URL: {api_url}")
-            logger.info(f"   📊 Token length: {len(token)} characters")
+            logger.info("💾 Saving authentication data:")
+            logger.debug("   🔑 Token length: %d characters", len(token))
+            logger.info("   🌐 API URL: %s", api_url)
             
-            import requests
-            server_url = f"http://localhost:{5666 if self.testing else 5600}"
             data = {"token": token, "url": api_url}
-            response = requests.post(f"{server_url}/api/0/token", json=data, timeout=5)
+            response = get_session().post(self._token_endpoint, json=data, timeout=5)
             if response.status_code == 200:
-                logger.info(f"✅ Authentication data saved to aw-server SQLite")
+                logger.info("✅ Authentication data saved to aw-server SQLite")
                 
                 # Update instance variables
                 self.auth_token = token
                 self.api_url = api_url
                 self.is_authenticated = True
+                self._auth_loaded = True
                 return True
             else:
-                logger.error(f"❌ Failed to save to aw-server: {response.status_code}")
+                logger.error("❌ Failed to save to aw-server: %s", response.status_code)
                 return False
             
         except Exception as e:
-            logger.error(f"❌ Failed to save authentication data: {e}")
+            logger.error("❌ Failed to save authentication data: %s", e)
             return False
     
     def clear_auth_data(self) -> bool:
@@ -96,29 +154,29 @@ class AwQtSettings:
         try:
             logger.info("🗑️ Clearing authentication data")
             
-            import requests
-            server_url = f"http://localhost:{5666 if self.testing else 5600}"
-            response = requests.delete(f"{server_url}/api/0/token", timeout=5)
+            response = get_session().delete(self._token_endpoint, timeout=5)
             if response.status_code == 200:
-                logger.info(f"✅ Authentication data cleared from aw-server SQLite")
+                logger.info("✅ Authentication data cleared from aw-server SQLite")
                 
                 # Update instance variables
                 self.auth_token = None
                 self.api_url = None
                 self.is_authenticated = False
+                self._auth_loaded = True
                 return True
             else:
-                logger.error(f"❌ Failed to clear from aw-server: {response.status_code}")
+                logger.error("❌ Failed to clear from aw-server: %s", response.status_code)
                 return False
             
         except Exception as e:
-            logger.error(f"❌ Failed to clear authentication data: {e}")
+            logger.error("❌ Failed to clear authentication data: %s", e)
             return False
     
     def get_auth_token(self) -> Optional[str]:
         """Get the stored authentication token."""
+        self.ensure_auth_loaded()
         if self.is_authenticated and self.auth_token:
-            logger.debug(f"🔑 Returning stored token: {self.auth_token[:20]}...")
+            logger.debug("🔑 Returning stored token (%d characters)", len(self.auth_token))
             return self.auth_token
         else:
             logger.debug("🔑 No authentication token available")
@@ -126,9 +184,16 @@ class AwQtSettings:
     
     def get_api_url(self) -> Optional[str]:
         """Get the stored API URL."""
+        self.ensure_auth_loaded()
         if self.is_authenticated and self.api_url:
-            logger.debug(f"🌐 Returning stored API URL: {self.api_url}")
+            logger.debug("🌐 Returning stored API URL: %s", self.api_url)
             return self.api_url
         else:
             logger.debug("🌐 No API URL available")
             return None
+
+
+@lru_cache(maxsize=2)
+def get_settings(testing: bool) -> AwQtSettings:
+    """Returns the shared settings instance, so config and auth data are only loaded once per mode"""
+    return AwQtSettings(testing)
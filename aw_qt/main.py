@@ -1,21 +1,29 @@
 import os
 import sys
+import importlib
 import logging
-import subprocess
-import platform
 import signal
 import threading
-from typing import Optional
 from time import sleep
+from typing import List, Optional
 
 import click
 from aw_core.log import setup_logging
 
 from .manager import Manager
-from .config import AwQtSettings
+from .config import get_settings
+from .urlscheme import redact_samay_url
 
 logger = logging.getLogger(__name__)
 
+# Set by the signal handlers to stop the service manager when running without a GUI
+_quit_signalled = False
+
+
+def _on_quit_signal(*args) -> None:
+    global _quit_signalled
+    _quit_signalled = True
+
 
 @click.command("aw-qt", help="A trayicon and service manager for Samay")
 @click.option(
@@ -51,8 +59,10 @@ def main(
     samay_url: Optional[str],
 ) -> None:
     # Since the .app can crash when started from Finder for unknown reasons, we send a syslog message here to make debugging easier.
-    if platform.system() == "Darwin":
-        subprocess.call("syslog -s 'aw-qt started'", shell=True)
+    if sys.platform == "darwin":
+        import syslog  # pylint: disable=import-outside-toplevel
+
+        syslog.syslog(syslog.LOG_NOTICE, "aw-qt started")
 
     setup_logging("aw-qt", testing=testing, verbose=verbose, log_file=True)
     logger.info("Started aw-qt...")
@@ -62,16 +72,12 @@ def main(
     for arg in sys.argv[1:]:
         if arg.startswith("samay://"):
             samay_url_from_args = arg
-            logger.info(f"🔗 Found samay:// URL in command line arguments: {arg}")
+            logger.info("🔗 Found samay:// URL in command line arguments: %s", redact_samay_url(arg))
             break
     
     # Use URL from command line if available, otherwise use --samay-url parameter
     final_samay_url = samay_url_from_args or samay_url
 
-    # Since the .app can crash when started from Finder for unknown reasons, we send a syslog message here to make debugging easier.
-    if platform.system() == "Darwin":
-        subprocess.call("syslog -s 'aw-qt successfully started logging'", shell=True)
-
     # Create a process group, become its leader
     # TODO: This shouldn't go here
     if sys.platform != "win32":
@@ -83,17 +89,23 @@ def main(
         except PermissionError:
             pass
 
-    config = AwQtSettings(testing=testing)
+    use_gui = not no_gui and not interactive_cli
+    if use_gui:
+        # Import Qt in the background while the config is loaded and modules are started
+        threading.Thread(
+            target=importlib.import_module, args=(".trayicon", __package__), daemon=True
+        ).start()
+
+    config = get_settings(testing)
+    parsed_modules = _parse_modules(autostart_modules)
     _autostart_modules = (
-        [m.strip() for m in autostart_modules.split(",") if m and m.lower() != "none"]
-        if autostart_modules
-        else config.autostart_modules
+        parsed_modules if parsed_modules is not None else config.autostart_modules
     )
 
     manager = Manager(testing=testing)
     manager.autostart(_autostart_modules)
 
-    if not no_gui and not interactive_cli:
+    if use_gui:
         from . import trayicon  # pylint: disable=import-outside-toplevel
 
         # run the trayicon, wait for signal to quit
@@ -103,15 +115,18 @@ def main(
         _interactive_cli(manager)
         error_code = 0
     else:
-        # wait for signal to quit
+        # wait for a signal to quit
+        signal.signal(signal.SIGINT, _on_quit_signal)
+        signal.signal(signal.SIGTERM, _on_quit_signal)
         if sys.platform == "win32":
-            # Windows doesn't support signals, so we just sleep until interrupted
-            try:
-                sleep(threading.TIMEOUT_MAX)
-            except KeyboardInterrupt:
-                pass
+            signal.signal(signal.SIGBREAK, _on_quit_signal)
+            # There's no signal.pause() on Windows, so check the flag now and then
+            while not _quit_signalled:
+                sleep(1)
         else:
-            signal.pause()
+            # Sleeps until a signal arrives, without any periodic wakeups
+            while not _quit_signalled:
+                signal.pause()
 
         error_code = 0
 
@@ -119,6 +134,15 @@ def main(
     sys.exit(error_code)
 
 
+def _parse_modules(autostart_modules: Optional[str]) -> Optional[List[str]]:
+    """Parses --autostart-modules, returns None if it wasn't given"""
+    if not autostart_modules:
+        return None
+    # `none` entries are dropped, so `none` on its own means autostarting nothing
+    modules = [m.strip() for m in autostart_modules.split(",")]
+    return [m for m in modules if m and m.lower() != "none"]
+
+
 def _interactive_cli(manager: Manager) -> None:
     while True:
         answer = input("> ")
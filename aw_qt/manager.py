@@ -3,10 +3,12 @@ import sys
 import logging
 import subprocess
 import platform
+import threading
+from operator import attrgetter
 from pathlib import Path
 from glob import glob
 from time import sleep
-from typing import Optional, List, Hashable, Set, Iterable
+from typing import Callable, Optional, List, Hashable, Set, Iterable
 
 import aw_core
 
@@ -26,6 +28,9 @@ def _log_modules(modules: List["Module"]) -> None:
 
 ignored_filenames = ["aw-cli", "aw-client", "aw-qt", "aw-qt.desktop", "aw-qt.spec"]
 
+# Resolved once, it's checked for every aw-* candidate during discovery
+_is_windows = platform.system() == "Windows"
+
 
 def filter_modules(modules: Iterable["Module"]) -> Set["Module"]:
     # Remove things matching the pattern which is not a module
@@ -37,7 +42,7 @@ def is_executable(path: str, filename: str) -> bool:
     if not os.path.isfile(path):
         return False
     # On windows all files ending with .exe are executables
-    if platform.system() == "Windows":
+    if _is_windows:
         return filename.endswith(".exe")
     # On Unix platforms all files having executable permissions are executables
     # We do not however want to include .desktop files
@@ -49,6 +54,18 @@ def is_executable(path: str, filename: str) -> bool:
         return True
 
 
+def _is_executable_entry(entry: "os.DirEntry[str]") -> bool:
+    """Same as is_executable, but uses the file type scandir() already read"""
+    try:
+        if not entry.is_file():
+            return False
+    except OSError:
+        return False
+    if _is_windows:
+        return entry.name.endswith(".exe")
+    return os.access(entry.path, os.X_OK) and not entry.name.endswith(".desktop")
+
+
 def _discover_modules_in_directory(path: str) -> List["Module"]:
     """Look for modules in given directory path and recursively in subdirs matching aw-*"""
     modules = []
@@ -97,23 +114,25 @@ def _discover_modules_system() -> List["Module"]:
 
     # logger.debug(f"Searching for system modules in PATH: {search_paths}")
     modules: List["Module"] = []
-    paths = [p for p in search_paths if os.path.isdir(p)]
-    for path in paths:
+    for path in search_paths:
+        # scandir fails on missing/non-directory entries, which saves a stat per PATH entry
         try:
-            ls = os.listdir(path)
+            entries = list(os.scandir(path))
         except PermissionError:
             logger.warning(f"PermissionError while listing {path}, skipping")
             continue
+        except OSError:
+            continue
 
-        for basename in ls:
-            if not basename.startswith("aw-"):
+        for entry in entries:
+            if not entry.name.startswith("aw-"):
                 continue
-            if not is_executable(os.path.join(path, basename), basename):
+            if not _is_executable_entry(entry):
                 continue
-            name = _filename_to_name(basename)
+            name = _filename_to_name(entry.name)
             # Only pick the first match (to respect PATH priority)
             if name not in [m.name for m in modules]:
-                modules.append(Module(name, Path(path) / basename, "system"))
+                modules.append(Module(name, Path(entry.path), "system"))
 
     modules = list(filter_modules(modules))
     logger.info(f"Found {len(modules)} system modules")
@@ -134,6 +153,8 @@ class Module:
         # self.location = "system" if _is_system_module(name) else "bundled"
         self._process: Optional[subprocess.Popen[str]] = None
         self._last_process: Optional[subprocess.Popen[str]] = None
+        # Called from a watcher thread when the process exits, whether or not it was stopped on purpose
+        self.on_exit: Optional[Callable[["Module"], None]] = None
 
     def __hash__(self) -> int:
         return hash((self.name, self.path))
@@ -170,6 +191,14 @@ class Module:
             exec_cmd, universal_newlines=True, startupinfo=startupinfo
         )
         self.started = True
+        threading.Thread(
+            target=self._watch, args=(self._process,), daemon=True
+        ).start()
+
+    def _watch(self, process: "subprocess.Popen[str]") -> None:
+        process.wait()
+        if self.on_exit is not None:
+            self.on_exit(self)
 
     def stop(self) -> None:
         """
@@ -213,12 +242,19 @@ class Module:
         # If returncode is none after p.poll(), module is still running
         return True if self._process.returncode is None else False
 
-    def read_log(self, testing: bool) -> str:
-        """Useful if you want to retrieve the logs of a module"""
+    def read_log(self, testing: bool, tail_bytes: Optional[int] = 64 * 1024) -> str:
+        """
+        Useful if you want to retrieve the logs of a module
+
+        Only the last ``tail_bytes`` of the log are read, pass None to read all of it.
+        """
         log_path = aw_core.log.get_latest_log_file(self.name, testing)
         if log_path:
-            with open(log_path) as f:
-                return f.read()
+            with open(log_path, "rb") as f:
+                if tail_bytes is not None:
+                    size = f.seek(0, os.SEEK_END)
+                    f.seek(max(0, size - tail_bytes))
+                return f.read().decode("utf-8", errors="replace")
         else:
             return "No log file found"
 
@@ -227,16 +263,19 @@ class Manager:
     def __init__(self, testing: bool = False) -> None:
         self.modules: List[Module] = []
         self.testing = testing
+        # Sorted by name, recomputed whenever self.modules changes
+        self._modules_bundled: List[Module] = []
+        self._modules_system: List[Module] = []
 
         self.discover_modules()
 
     @property
     def modules_system(self) -> List[Module]:
-        return [m for m in self.modules if m.type == "system"]
+        return self._modules_system
 
     @property
     def modules_bundled(self) -> List[Module]:
-        return [m for m in self.modules if m.type == "bundled"]
+        return self._modules_bundled
 
     def discover_modules(self) -> None:
         # These should always be bundled with aw-qt
@@ -249,8 +288,18 @@ class Manager:
             if m not in self.modules:
                 self.modules.append(m)
 
-    def get_unexpected_stops(self) -> List[Module]:
-        return list(filter(lambda x: x.started and not x.is_alive(), self.modules))
+        by_name = sorted(self.modules, key=attrgetter("name"))
+        self._modules_bundled = [m for m in by_name if m.type == "bundled"]
+        self._modules_system = [m for m in by_name if m.type == "system"]
+
+    def get_alive_modules(self) -> Set[Module]:
+        return {m for m in self.modules if m.is_alive()}
+
+    def get_unexpected_stops(self, alive: Optional[Set[Module]] = None) -> List[Module]:
+        # Pass the result of get_alive_modules() to avoid polling every process again
+        if alive is None:
+            return list(filter(lambda x: x.started and not x.is_alive(), self.modules))
+        return [m for m in self.modules if m.started and m not in alive]
 
     def start(self, module_name: str) -> None:
         # NOTE: Will always prefer a bundled version, if available. This will not affect the
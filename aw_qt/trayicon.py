@@ -1,18 +1,29 @@
-import json
 import logging
 import os
+import shutil
 import signal
+import socket
 import subprocess
 import sys
+import threading
 import webbrowser
-import requests
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Dict, Optional
-from urllib.parse import urlparse, parse_qs, unquote
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import aw_core
 from PyQt6 import QtCore
-from PyQt6.QtCore import QTimer, pyqtSlot
+from PyQt6.QtCore import (
+    QEvent,
+    QObject,
+    QRunnable,
+    QSocketNotifier,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
 from PyQt6.QtGui import QIcon, QAction
 from PyQt6.QtWidgets import (
     QApplication,
@@ -24,17 +35,24 @@ from PyQt6.QtWidgets import (
 )
 
 from .manager import Manager, Module
-from .config import AwQtSettings
-
-# macOS URL scheme handling
-if sys.platform == "darwin":
-    try:
-        import AppKit
-    except ImportError:
-        AppKit = None
+from .config import get_session, get_settings
+from .urlscheme import parse_samay_url, redact_samay_url
 
 logger = logging.getLogger(__name__)
 
+# requests is imported on first use, it's slow to import and not needed to show the trayicon
+_requests: Any = None
+
+
+def _get_requests() -> Any:
+    global _requests
+    if _requests is None:
+        import requests
+
+        _requests = requests
+    return _requests
+
+
 # Import the pending buffer from main
 try:
     from .main import pending_samay_url
@@ -42,11 +60,14 @@ except Exception:
     pending_samay_url = None
 
 
+@lru_cache(maxsize=1)
 def get_env() -> Dict[str, str]:
     """
     Necessary for xdg-open to work properly when PyInstaller overrides LD_LIBRARY_PATH
 
     https://github.com/ActivityWatch/activitywatch/issues/208#issuecomment-417346407
+
+    The result is computed once and shared, callers must not modify it.
     """
     env = dict(os.environ)  # make a copy of the environment
     lp_key = "LD_LIBRARY_PATH"  # for GNU/Linux and *BSD.
@@ -60,21 +81,57 @@ def get_env() -> Dict[str, str]:
     return env
 
 
+# Launchers found in PATH, misses aren't stored so a launcher installed later is still found
+_executable_paths: Dict[str, str] = {}
+
+
+def _find_executable(name: str) -> str:
+    # Resolved once, instead of searching PATH on every launch. Falls back to the bare name.
+    path = _executable_paths.get(name)
+    if path is None:
+        path = shutil.which(name)
+        if path is None:
+            return name
+        _executable_paths[name] = path
+    return path
+
+
+def _spawn_detached(args: List[str], env: Optional[Dict[str, str]] = None) -> None:
+    """Starts a launcher like xdg-open in its own session without leaving a zombie behind"""
+    args = [_find_executable(args[0])] + args[1:]
+    # Popen can't use posix_spawn with start_new_session, and fork has to copy the page tables
+    # of this (large) Qt process first, so spawn directly where supported
+    if hasattr(os, "posix_spawnp"):
+        try:
+            pid = os.posix_spawnp(
+                args[0], args, env if env is not None else os.environ, setsid=True
+            )
+        except NotImplementedError:
+            pass
+        else:
+            threading.Thread(target=os.waitpid, args=(pid, 0), daemon=True).start()
+            return
+
+    proc = subprocess.Popen(args, env=env, start_new_session=True)
+    # xdg-open can stay around until the program it opened exits, so reap it off the UI thread
+    threading.Thread(target=proc.wait, daemon=True).start()
+
+
 def open_url(url: str) -> None:
     if sys.platform == "linux":
         env = get_env()
-        subprocess.Popen(["xdg-open", url], env=env)
+        _spawn_detached(["xdg-open", url], env=env)
     else:
         webbrowser.open(url)
 
 
 def open_webui(root_url: str) -> None:
-    print("Opening dashboard")
+    logger.debug("Opening dashboard")
     open_url(root_url)
 
 
 def open_apibrowser(root_url: str) -> None:
-    print("Opening api browser")
+    logger.debug("Opening api browser")
     open_url(root_url + "/api")
 
 
@@ -83,16 +140,17 @@ def open_dir(d: str) -> None:
     if sys.platform == "win32":
         os.startfile(d)
     elif sys.platform == "darwin":
-        subprocess.Popen(["open", d])
+        _spawn_detached(["open", d])
     else:
         env = get_env()
-        subprocess.Popen(["xdg-open", d], env=env)
+        _spawn_detached(["xdg-open", d], env=env)
 
 
-def get_auth_status(root_url: str) -> tuple[bool, str]:
+def get_auth_status(root_url: str) -> Tuple[bool, str]:
     """Check if user is authenticated and return status and token."""
+    requests = _get_requests()
     try:
-        response = requests.get(f"{root_url}/api/0/token", timeout=5)
+        response = get_session().get(f"{root_url}/api/0/token", timeout=(1, 3))
         if response.status_code == 200:
             data = response.json()
             token = data.get('token', '')
@@ -104,8 +162,9 @@ def get_auth_status(root_url: str) -> tuple[bool, str]:
 
 def logout_user(root_url: str) -> bool:
     """Logout user by deleting the stored token."""
+    requests = _get_requests()
     try:
-        response = requests.delete(f"{root_url}/api/0/token", timeout=5)
+        response = get_session().delete(f"{root_url}/api/0/token", timeout=(1, 3))
         return response.status_code == 200
     except requests.RequestException:
         return False
@@ -118,10 +177,39 @@ def open_auth_page(root_url: str) -> None:
     open_url(auth_url)
 
 
+class _JobSignals(QObject):
+    done = pyqtSignal(object)
+
+
+class _BackgroundJob(QRunnable):
+    """Runs a blocking call (such as an HTTP request) on the global thread pool.
+
+    The return value is emitted through ``signals.done``, slots on GUI objects
+    connected to it run on the GUI thread.
+    """
+
+    def __init__(self, fn: Callable[[], Any]) -> None:
+        super().__init__()
+        self.fn = fn
+        self.signals = _JobSignals()
+
+    def run(self) -> None:
+        self.signals.done.emit(self.fn())
+
+
+# aw-server is started right before the trayicon, so retry loading the auth state for a while
+_AUTH_LOAD_RETRY_MS = 2000
+_AUTH_LOAD_ATTEMPTS = 15
+
 
 # Global reference to the live tray icon instance (used by macOS URL callbacks)
 current_tray_icon = None  # set in TrayIcon.__init__
 class TrayIcon(QSystemTrayIcon):
+    # Emitted with the new state whenever the user logs in or out
+    auth_changed = pyqtSignal(bool)
+    # Emitted from a module's watcher thread when its process exits, delivered on the GUI thread
+    module_exited = pyqtSignal(object)
+
     def __init__(
         self,
         manager: Manager,
@@ -131,21 +219,28 @@ class TrayIcon(QSystemTrayIcon):
     ) -> None:
         QSystemTrayIcon.__init__(self, icon, parent)
         self._parent = parent  # QSystemTrayIcon also tries to save parent info but it screws up the type info
-        self.setToolTip("Samay" + (" (testing)" if testing else ""))
+        base_tooltip = "Samay" + (" (testing)" if testing else "")
+        self.setToolTip(base_tooltip)
+        self._tooltip_auth = f"{base_tooltip} - Authenticated"
+        self._tooltip_noauth = f"{base_tooltip} - Not authenticated"
 
         self.manager = manager
         self.testing = testing
 
         self.root_url = f"http://localhost:{5666 if self.testing else 5600}"
         self.activated.connect(self.on_activated)
+        self.auth_changed.connect(self._on_auth_changed)
+        self.module_exited.connect(self._on_module_exited)
+        for module in self.manager.modules:
+            module.on_exit = self.module_exited.emit
         
         # Load configuration
-        self.config = AwQtSettings(testing=testing)
+        self.config = get_settings(testing)
         
-        # Authentication status (use config values)
-        self.is_authenticated = self.config.is_authenticated
+        # Authentication status, fetched from aw-server in the background by _load_auth_async
         self.auth_token = self.config.auth_token
         self.api_url = self.config.api_url
+        self.is_authenticated = self.config.is_authenticated
 
         # Persistent menu & actions (strong refs) - macOS fix
         self.menu: Optional[QMenu] = None
@@ -153,29 +248,44 @@ class TrayIcon(QSystemTrayIcon):
         self.login_action: Optional[QAction] = None
         self.logout_action: Optional[QAction] = None
         self.auth_status_action: Optional[QAction] = None
+        self._modules_menu: Optional[QMenu] = None
+        # Module -> action in the modules submenu, so updates don't walk all of its actions
+        self._module_actions: Dict[Module, QAction] = {}
+        # Checked state last written to each module action, so ticks only touch actions that changed
+        self._module_checked: Dict[Module, bool] = {}
+        self._logout_job: Optional[_BackgroundJob] = None
+        self._auth_load_job: Optional[_BackgroundJob] = None
+        self._auth_load_attempts = 0
+
+        # Resolved once, these don't change while running
+        self._log_dir = aw_core.dirs.get_log_dir(None)
+        self._config_dir = aw_core.dirs.get_config_dir(None)
+        self._exit_icon = QIcon.fromTheme(
+            "application-exit", QIcon("media/application_exit.png")
+        )
+        # This check is an attempted solution to: https://github.com/ActivityWatch/activitywatch/issues/62
+        # Seems to be in agreement with: https://github.com/OtterBrowser/otter-browser/issues/1313
+        #   "it seems that the bug is also triggered when creating a QIcon with an invalid path"
+        self._exit_icon_ok = bool(self._exit_icon.availableSizes())
 
         # Create the menu ONCE and keep it
         self.menu = QMenu(self._parent)
         self.setContextMenu(self.menu)
+        # Checkmarks are skipped by the tick while the icon is hidden, so catch up before showing
+        self.menu.aboutToShow.connect(self._update_modules_menu)
         self._rebuild_menu_inplace()  # Update in place instead of replacing
         self._update_auth_status()
-        
-        # Auth data already loaded by AwQtSettings - no need to reload
-        # Rebuild menu to reflect loaded auth status
-        if self.is_authenticated:
-            logger.info("🔄 Rebuilding menu to reflect authenticated state")
-            self._rebuild_menu_inplace()
+        self._load_auth_async()
         
         # Process any pending URL from QEvent.FileOpen
         global pending_samay_url
-        logger.info(f"🔧 TrayIcon init - checking pending URL: {pending_samay_url}")
+        logger.info("🔧 TrayIcon init - checking pending URL: %s", redact_samay_url(pending_samay_url))
         if pending_samay_url:
             logger.info("🔄 Found pending samay:// URL at startup; processing now")
             self.handle_samay_url(pending_samay_url)
             pending_samay_url = None
         else:
             logger.info("ℹ️ No pending URL at startup")
-        
 
         # Register global tray handle for URL callbacks
         global current_tray_icon
@@ -185,6 +295,49 @@ class TrayIcon(QSystemTrayIcon):
         if reason == QSystemTrayIcon.ActivationReason.DoubleClick:
             open_webui(self.root_url)
     
+    def _load_auth_async(self) -> None:
+        """Fetch the stored auth state without blocking the tray from showing."""
+        self._auth_load_attempts += 1
+        job = _BackgroundJob(self.config.ensure_auth_loaded)
+        job.signals.done.connect(self._on_auth_loaded)
+        self._auth_load_job = job  # keep a reference until the result is delivered
+        QThreadPool.globalInstance().start(job)
+
+    @pyqtSlot(object)
+    def _on_auth_loaded(self, loaded: bool) -> None:
+        self._auth_load_job = None
+        if not loaded:
+            if self._auth_load_attempts < _AUTH_LOAD_ATTEMPTS:
+                QTimer.singleShot(_AUTH_LOAD_RETRY_MS, self._load_auth_async)
+            else:
+                logger.warning("Giving up loading authentication data, aw-server isn't reachable")
+            return
+        self.auth_token = self.config.auth_token
+        self.api_url = self.config.api_url
+        self.is_authenticated = self.config.is_authenticated
+        self.auth_changed.emit(self.is_authenticated)
+
+    @pyqtSlot(object)
+    def _on_module_exited(self, module: Module) -> None:
+        """Handle a single module's exit without rescanning every module."""
+        # Still flagged as started means it wasn't stopped by us, unless it was restarted meanwhile
+        if module.started and not module.is_alive():
+            self._show_module_failed_dialog(module)
+            module.stop()
+
+        action = self._module_actions.get(module)
+        if action is not None:
+            is_alive = module.is_alive()
+            if self._module_checked.get(module) != is_alive:
+                self._module_checked[module] = is_alive
+                action.setChecked(is_alive)
+
+    @pyqtSlot(bool)
+    def _on_auth_changed(self, authenticated: bool) -> None:
+        """Refresh tooltip and menu after a login or logout."""
+        self._update_auth_status()
+        self._refresh_auth_actions()
+
     def _update_auth_status(self) -> None:
         """Update authentication status."""
         # Use stored authentication status instead of API call
@@ -194,205 +347,115 @@ class TrayIcon(QSystemTrayIcon):
     
     def _update_tooltip(self) -> None:
         """Update tooltip with authentication status."""
-        base_tooltip = "Samay" + (" (testing)" if self.testing else "")
-        if self.is_authenticated:
-            self.setToolTip(f"{base_tooltip} - Authenticated")
-        else:
-            self.setToolTip(f"{base_tooltip} - Not authenticated")
-    
-    def _load_stored_auth_data(self):
-        """Load authentication data from aw-server SQLite storage."""
-        try:
-            import requests
-            server_url = f"http://localhost:{5666 if self.testing else 5600}"
-            response = requests.get(f"{server_url}/api/0/token", timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                token = data.get('token')
-                url = data.get('url')
-                if token and url:
-                    self.auth_token = token
-                    self.api_url = url
-                    self.is_authenticated = True
-                    # Update config as well
-                    self.config.save_auth_data(token, url)
-                    return
-            
-            logger.info("ℹ️ No stored authentication data found")
-        except Exception as e:
-            logger.debug(f"Could not load from aw-server: {e}")
-            logger.info("ℹ️ No stored authentication data found")
-    
-    def _clear_auth_data(self) -> None:
-        """Clear authentication data from aw-server SQLite storage."""
-        try:
-            import requests
-            server_url = f"http://localhost:{5666 if self.testing else 5600}"
-            response = requests.delete(f"{server_url}/api/0/token", timeout=2)
-            if response.status_code == 200:
-                logger.info("🔐 Authentication data cleared from aw-server")
-            else:
-                logger.warning(f"Failed to clear auth data: {response.status_code}")
-        except Exception as e:
-            logger.exception(f"❌ Error clearing auth data: {e}")
-    
-    def _start_auth_status_checker(self) -> None:
-        """Auth status only changes on user actions, not polling."""
-        logger.info("ℹ️ Auth status checker disabled - using event-driven updates only")
+        self.setToolTip(self._tooltip_auth if self.is_authenticated else self._tooltip_noauth)
     
-    
-    def _check_auth_status(self) -> None:
-        """Check if authentication status has changed and update UI accordingly."""
-        try:
-            # Check if we now have stored auth data (regardless of current state)
-            old_auth_state = self.is_authenticated
-            self._load_stored_auth_data()
-            
-            # If auth status changed from not authenticated to authenticated
-            if not old_auth_state and self.is_authenticated:
-                logger.info("🔄 Authentication status changed - rebuilding menu")
-                self._update_auth_status()
-                self._rebuild_menu_inplace()
-                
-                # Force tray icon to refresh with multiple attempts
-                self.show()
-                # UI refresh timer - ensures tray icon visual state updates after menu changes
-                QTimer.singleShot(100, lambda: self.show())
-                
-                # Stop the timer since we're now authenticated
-                if hasattr(self, 'auth_check_timer'):
-                    self.auth_check_timer.stop()
-                    logger.info("🔄 Stopped auth status checker - now authenticated")
-        except Exception as e:
-            logger.exception(f"❌ Error checking auth status: {e}")
-
-    def _build_rootmenu(self) -> None:
-        menu = QMenu(self._parent)
-
-        if self.testing:
-            menu.addAction("Running in testing mode")  # .setEnabled(False)
-            menu.addSeparator()
-
-        # openWebUIIcon = QIcon.fromTheme("open")
-        # menu.addAction("Open Dashboard", lambda: open_webui(self.root_url))
-        # menu.addAction("Open API Browser", lambda: open_apibrowser(self.root_url))
-
-        menu.addSeparator()
-
-        modulesMenu = menu.addMenu("Modules")
-        self._build_modulemenu(modulesMenu)
-
-        menu.addSeparator()
-        menu.addAction(
-            "Open log folder", lambda: open_dir(aw_core.dirs.get_log_dir(None))
-        )
-        menu.addAction(
-            "Open config folder", lambda: open_dir(aw_core.dirs.get_config_dir(None))
-        )
-        menu.addSeparator()
-
-        exitIcon = QIcon.fromTheme(
-            "application-exit", QIcon("media/application_exit.png")
-        )
-        # This check is an attempted solution to: https://github.com/ActivityWatch/activitywatch/issues/62
-        # Seems to be in agreement with: https://github.com/OtterBrowser/otter-browser/issues/1313
-        #   "it seems that the bug is also triggered when creating a QIcon with an invalid path"
-        if exitIcon.availableSizes():
-            menu.addAction(exitIcon, "Quit Samay", lambda: exit(self.manager))
-        else:
-            menu.addAction("Quit Samay", lambda: exit(self.manager))
-
     def handle_samay_url(self, url: str):
         """Handle samay:// URL scheme events."""
         try:
-            logger.info(f"🔗 Processing samay:// URL: {url}")
-
-            parsed = urlparse(url)
-            if parsed.scheme != "samay":
-                logger.error(f"❌ Invalid URL scheme: {parsed.scheme}")
+            parsed = parse_samay_url(url)
+            if parsed is None:
+                logger.error("❌ Invalid URL scheme: %s", urlsplit(url).scheme)
                 return
 
-            # Extract token and API URL
-            query_params = parse_qs(parsed.query)
-            token = query_params.get("token", [None])[0]
-            api_url = query_params.get("url", [None])[0]
+            # Extract token and API URL (already percent-decoded)
+            _, token, api_url = parsed
 
             if not token or not api_url:
-                logger.error("❌ Missing token or API URL in samay:// URL")
+                logger.error(
+                    "❌ Missing token or API URL in samay:// URL (token: %s, url: %s)",
+                    bool(token),
+                    bool(api_url),
+                )
+                return
+
+            # macOS can deliver the same URL more than once, repeats are a no-op
+            if self.is_authenticated and token == self.auth_token and api_url == self.api_url:
+                logger.debug("samay:// URL matches the current authentication, ignoring")
                 return
 
-            api_url = unquote(api_url)
+            logger.info("🔐 Processing samay:// URL: url=%s", api_url)
+            logger.debug("   🔑 Token length: %d characters", len(token))
 
-            # Trim logging of sensitive token
-            safe_tok = token[:10] + "…" if len(token) > 10 else token
-            logger.info(f"🔐 Extracted token: {safe_tok}")
-            logger.info(f"🔗 Extracted API URL: {api_url}")
+            # Persist to config first, the state is left unchanged if that fails
+            try:
+                saved = self.config.save_auth_data(token, api_url)
+            except Exception:
+                logger.exception("⚠️ Failed to save auth data to config")
+                saved = False
+            if not saved:
+                self._show_login_failed()
+                return
 
             # Store authentication data
             self.auth_token = token
             self.api_url = api_url
             self.is_authenticated = True
 
-            # Persist to config
+            # Refresh tooltip and menu to reflect auth status
             try:
-                self.config.save_auth_data(token, api_url)
-            except Exception:
-                logger.exception("⚠️ Failed to save auth data to config")
-
-            # Rebuild menu to reflect auth status
-            try:
-                self._update_auth_status()
-                self._rebuild_menu_inplace()
-                # Force immediate refresh to ensure menu is properly updated
-                # UI synchronization timer - prevents race conditions in menu updates
-                QTimer.singleShot(50, lambda: self.show())
+                self.auth_changed.emit(True)
             except Exception:
                 logger.exception("⚠️ Failed to rebuild tray menu after auth")
 
-            # Notify user with authentication success popup
-            def _show():
-                try:
-                    logger.info("🎉 Showing authentication success popup")
-                    msg_box = QMessageBox(self._parent)
-                    msg_box.setWindowTitle("Authentication Success")
-                    msg_box.setText("Successfully connected to desktop!")
-                    msg_box.setInformativeText(f"API URL: {api_url}")
-                    msg_box.setIcon(QMessageBox.Icon.Information)
-                    msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-                    msg_box.exec()
-                    logger.info("✅ Authentication success popup shown")
-                except Exception as e:
-                    logger.exception(f"❌ Error showing popup: {e}")
-            
-            # Error recovery timer - ensures popup shows after error handling completes
+            # Notify user with a tray notification, unlike a message box this doesn't block the menu
             try:
-                QTimer.singleShot(100, _show)
+                self.showMessage(
+                    "Authentication Success",
+                    f"Successfully connected to desktop!\nAPI URL: {api_url}",
+                    QSystemTrayIcon.MessageIcon.Information,
+                    4000,
+                )
             except Exception:
-                logger.exception("⚠️ Failed to schedule authentication message box")
+                logger.exception("⚠️ Failed to show authentication notification")
 
         except Exception as e:
-            logger.exception(f"❌ Error processing samay:// URL: {e}")
+            logger.exception("❌ Error processing samay:// URL: %s", e)
     
     def _handle_login(self) -> None:
         """Handle login button click."""
         open_auth_page(self.root_url)
         # No dialog needed - browser opening provides sufficient feedback
-        self._rebuild_menu_inplace()
     
     def _handle_logout(self) -> None:
         """Handle logout button click."""
+        if self._logout_job is not None:
+            return  # already logging out
+        # Clearing the token is a blocking HTTP request, run it off the UI thread
+        job = _BackgroundJob(self.config.clear_auth_data)
+        job.signals.done.connect(self._on_logout_done)
+        self._logout_job = job  # keep a reference until the result is delivered
+        if self.logout_action is not None:
+            self.logout_action.setEnabled(False)
+        QThreadPool.globalInstance().start(job)
+
+    def _show_login_failed(self) -> None:
+        QTimer.singleShot(0, lambda: QMessageBox.warning(
+            self._parent, "Login Failed", "Failed to save the login. Please try again.")
+        )
+
+    def _show_logout_failed(self) -> None:
+        # Event loop deferral timer - prevents UI blocking during error handling
+        QTimer.singleShot(0, lambda: QMessageBox.warning(
+            self._parent, "Logout Failed", "Failed to logout. Please try again.")
+        )
+
+    @pyqtSlot(object)
+    def _on_logout_done(self, cleared: bool) -> None:
+        self._logout_job = None
+        if self.logout_action is not None:
+            self.logout_action.setEnabled(True)
+        if not cleared:
+            # aw-server still has the token, so we're still logged in
+            self._show_logout_failed()
+            return
         try:
-            # Clear stored authentication data from both Keychain and config file
-            self._clear_auth_data()
-            self.config.clear_auth_data()
-            
             # Update authentication state
             self.is_authenticated = False
             self.auth_token = ""
             self.api_url = ""
             
-            # Rebuild menu to reflect logout
-            self._rebuild_menu_inplace()
+            # Refresh tooltip and menu to reflect logout
+            self.auth_changed.emit(False)
             
             # Defer dialog so menu closes first
             def _show():
@@ -405,11 +468,8 @@ class TrayIcon(QSystemTrayIcon):
             # Event loop deferral timer - ensures UI operations execute in correct order
             QTimer.singleShot(0, _show)
         except Exception as e:
-            logger.exception(f"❌ Error during logout: {e}")
-            # Event loop deferral timer - prevents UI blocking during error handling
-            QTimer.singleShot(0, lambda: QMessageBox.warning(
-                self._parent, "Logout Failed", "Failed to logout. Please try again.")
-            )
+            logger.exception("❌ Error during logout: %s", e)
+            self._show_logout_failed()
 
     def _rebuild_menu_inplace(self) -> None:
         """Rebuild the persistent tray menu without replacing the QMenu instance."""
@@ -424,118 +484,118 @@ class TrayIcon(QSystemTrayIcon):
             self.menu.addAction("Running in testing mode").setEnabled(True)
             self.menu.addSeparator()
 
-        # Authentication section
+        # Authentication section, all actions are kept and toggled by _refresh_auth_actions
         self.auth_menu = self.menu.addMenu("Authentication")
 
-        if self.is_authenticated:
-            self.auth_status_action = self.auth_menu.addAction("✓ Authenticated")
-            self.auth_status_action.setEnabled(False)
+        self.login_action = self.auth_menu.addAction("Login")
+        self.login_action.triggered.connect(self._handle_login)
 
-            self.logout_action = self.auth_menu.addAction("Logout")
-            # Make sure it's explicitly enabled
-            self.logout_action.setEnabled(True)
-            self.logout_action.triggered.connect(self._handle_logout)
-        else:
-            self.login_action = self.auth_menu.addAction("Login")
-            self.login_action.setEnabled(True)
-            self.login_action.triggered.connect(self._handle_login)
+        self.auth_status_action = self.auth_menu.addAction("Not authenticated")
+        self.auth_status_action.setEnabled(False)
 
-            self.auth_status_action = self.auth_menu.addAction("Not authenticated")
-            self.auth_status_action.setEnabled(False)
+        self.logout_action = self.auth_menu.addAction("Logout")
+        self.logout_action.triggered.connect(self._handle_logout)
+
+        self._refresh_auth_actions()
 
         self.menu.addSeparator()
 
-        modulesMenu = self.menu.addMenu("Modules")
-        self._populate_modules_menu(modulesMenu)
+        self._modules_menu = self.menu.addMenu("Modules")
+        self._modules_menu.triggered.connect(self._on_module_action_triggered)
+        self._populate_modules_menu(self._modules_menu)
 
         self.menu.addSeparator()
-        self.menu.addAction("Open log folder", lambda: open_dir(aw_core.dirs.get_log_dir(None)))
-        self.menu.addAction("Open config folder", lambda: open_dir(aw_core.dirs.get_config_dir(None)))
+        self.menu.addAction("Open log folder", partial(open_dir, self._log_dir))
+        self.menu.addAction("Open config folder", partial(open_dir, self._config_dir))
         self.menu.addSeparator()
 
-        exitIcon = QIcon.fromTheme("application-exit", QIcon("media/application_exit.png"))
-        if exitIcon.availableSizes():
-            self.menu.addAction(exitIcon, "Quit Samay", lambda: exit(self.manager))
+        if self._exit_icon_ok:
+            self.menu.addAction(self._exit_icon, "Quit Samay", lambda: exit(self.manager))
         else:
             self.menu.addAction("Quit Samay", lambda: exit(self.manager))
         
         # Force menu refresh after rebuild
         self.show()
 
-    def _recreate_menu_completely(self) -> None:
-        """Fallback method for complete menu recreation if needed."""
-        try:
-            # Only use this as a last resort
-            logger.info("🔄 Using fallback menu recreation method")
-            self._rebuild_menu_inplace()
-        except Exception as e:
-            logger.exception(f"❌ Error in fallback menu recreation: {e}")
+    def _refresh_auth_actions(self) -> None:
+        """Update the Authentication submenu in place for the current auth state."""
+        if self.login_action is None or self.logout_action is None or self.auth_status_action is None:
+            return
+        self.login_action.setVisible(not self.is_authenticated)
+        self.logout_action.setVisible(self.is_authenticated)
+        self.auth_status_action.setText(
+            "✓ Authenticated" if self.is_authenticated else "Not authenticated"
+        )
 
-    def _populate_modules_menu(self, modulesMenu: QMenu) -> None:
-        """Populate the modules submenu."""
-        def show_module_failed_dialog(module: Module) -> None:
+    def _update_modules_menu(self) -> None:
+        """Update modules menu and check for unexpected exits."""
+        # Poll every module process once per tick, and reuse it for both checks below
+        alive = self.manager.get_alive_modules()
+        # Nobody can see the checkmarks while the tray icon is hidden
+        if self.isVisible():
+            for module, action in self._module_actions.items():
+                is_alive = module in alive
+                if self._module_checked.get(module) != is_alive:
+                    self._module_checked[module] = is_alive
+                    action.setChecked(is_alive)
+
+        # Check for unexpected exits
+        unexpected_exits = self.manager.get_unexpected_stops(alive)
+        if unexpected_exits:
+            for module in unexpected_exits:
+                self._show_module_failed_dialog(module)
+                module.stop()
+
+    @pyqtSlot(QAction)
+    def _on_module_action_triggered(self, action: QAction) -> None:
+        # One handler for the whole submenu, the module is carried in the action's data
+        module = action.data()
+        if isinstance(module, Module):
+            # Qt already flipped the checkmark, resync it on the next update whatever the outcome
+            self._module_checked.pop(module, None)
+            module.toggle(self.testing)
+
+    def _show_module_failed_dialog(self, module: Module) -> None:
+        # Defer dialog to avoid blocking the tray menu stack on macOS
+        def _show():
             box = QMessageBox(self._parent)
             box.setIcon(QMessageBox.Icon.Warning)
             box.setText(f"Module {module.name} quit unexpectedly")
             box.setDetailedText(module.read_log(self.testing))
-
             restart_button = QPushButton("Restart", box)
-            restart_button.clicked.connect(module.start)
+            restart_button.clicked.connect(lambda: module.start(self.testing))
             box.addButton(restart_button, QMessageBox.ButtonRole.AcceptRole)
-            box.setStandardButtons(QMessageBox.StandardButton.Cancel)
-
-            box.show()
-
-
-    def _update_modules_menu(self, modulesMenu: QMenu, show_module_failed_dialog) -> None:
-        """Update modules menu and check for unexpected exits."""
-        for action in modulesMenu.actions():
-            if action.isEnabled():
-                module: Module = action.data()
-                alive = module.is_alive()
-                action.setChecked(alive)
-        
-        # Check for unexpected exits
-        unexpected_exits = self.manager.get_unexpected_stops()
-        if unexpected_exits:
-            for module in unexpected_exits:
-                show_module_failed_dialog(module)
-                module.stop()
+            box.exec()
+        # Event loop deferral timer - ensures UI operations execute in correct order
+        QTimer.singleShot(0, _show)
 
     def _populate_modules_menu(self, modulesMenu: QMenu) -> None:
         """Populate the modules submenu with deferred dialogs for macOS compatibility."""
         modulesMenu.clear()
+        self._module_actions = {}
+        self._module_checked = {}
 
-        def show_module_failed_dialog(module: Module) -> None:
-            # Defer dialog to avoid blocking the tray menu stack on macOS
-            def _show():
-                box = QMessageBox(self._parent)
-                box.setIcon(QMessageBox.Icon.Warning)
-                box.setText(f"Module {module.name} quit unexpectedly")
-                box.setDetailedText(module.read_log(self.testing))
-                restart_button = QPushButton("Restart", box)
-                restart_button.clicked.connect(module.start)
-                box.addButton(restart_button, QMessageBox.ButtonRole.AcceptRole)
-                box.exec()
-            # Event loop deferral timer - ensures UI operations execute in correct order
-            QTimer.singleShot(0, _show)
-
-        def add_module_menuitem(module: Module) -> None:
-            title = module.name
-            ac = modulesMenu.addAction(title, lambda: module.toggle(self.testing))
-            ac.setData(module)
-            ac.setCheckable(True)
-            ac.setChecked(module.is_alive())
-
+        # Build all actions first and insert them in one go, instead of one menu update per action
+        actions: List[QAction] = []
         for location, modules in [
             ("bundled", self.manager.modules_bundled),
             ("system", self.manager.modules_system),
         ]:
-            header = modulesMenu.addAction(location)
+            header = QAction(location, modulesMenu)
             header.setEnabled(False)
+            actions.append(header)
 
-            for module in sorted(modules, key=lambda m: m.name):
-                add_module_menuitem(module)
+            for module in modules:
+                ac = QAction(module.name, modulesMenu)
+                ac.setData(module)
+                ac.setCheckable(True)
+                is_alive = module.is_alive()
+                ac.setChecked(is_alive)
+                self._module_checked[module] = is_alive
+                actions.append(ac)
+                self._module_actions[module] = ac
+
+        modulesMenu.addActions(actions)
 
         # Add failed modules with deferred dialogs
         failed_modules = [m for m in self.manager.modules if getattr(m, "failed", False)]
@@ -543,7 +603,7 @@ class TrayIcon(QSystemTrayIcon):
             modulesMenu.addSeparator()
             for module in failed_modules:
                 act = QAction(f"⚠️ {module.name} (failed)", self._parent)
-                act.triggered.connect(lambda _checked=False, m=module: show_module_failed_dialog(m))
+                act.triggered.connect(lambda _checked=False, m=module: self._show_module_failed_dialog(m))
                 modulesMenu.addAction(act)
 
 
@@ -558,6 +618,14 @@ def exit(manager: Manager) -> None:
     QApplication.quit()
 
 
+def _drain_socket(sock: socket.socket) -> None:
+    try:
+        while sock.recv(4096):
+            pass
+    except OSError:
+        pass
+
+
 def run(manager: Manager, testing: bool = False, samay_url: Optional[str] = None) -> Any:
     logger.info("Creating trayicon...")
     # print(QIcon.themeSearchPaths())
@@ -568,64 +636,35 @@ def run(manager: Manager, testing: bool = False, samay_url: Optional[str] = None
     # Install QEvent.FileOpen filter for URL scheme handling (no PyObjC needed!)
     if sys.platform == "darwin":
         try:
-            from PyQt6.QtCore import QObject, QEvent
-            import urllib.parse
-            import json
-            import os
-            
-            
-            BUNDLE_ID = "net.samay.Samay"
-            FALLBACK_STORE = os.path.expanduser("~/Library/Application Support/activitywatch/aw-qt/auth.json")
-            
-            def ensure_dir(path):
-                d = os.path.dirname(path)
-                if d and not os.path.exists(d):
-                    os.makedirs(d, exist_ok=True)
-            
             def save_token_url(token: str, target_url: str):
-                import requests
-                server_url = f"http://localhost:5600"
-                
-                try:
-                    response = requests.post(f"{server_url}/api/0/token", 
-                                           json={"token": token, "url": target_url}, 
-                                           timeout=2)
-                    if response.status_code == 200:
-                        logger.info("✅ Authentication data stored in aw-server")
-                    else:
-                        logger.error(f"❌ Failed to store auth data: {response.status_code}")
-                except Exception as e:
-                    logger.exception(f"❌ Error storing auth data: {e}")
+                # Goes through the shared settings, so the tray's own save of the same URL is a no-op
+                get_settings(testing).save_auth_data(token, target_url)
             
             def parse_and_store(raw_url: str):
                 """Parse samay:// URL and store token/URL securely."""
                 try:
-                    parsed = urllib.parse.urlparse(raw_url)
-                    if parsed.scheme != "samay":
+                    parsed = parse_samay_url(raw_url)
+                    if parsed is None:
                         return False
                     
                     # Action is in netloc part: samay://token
-                    if parsed.netloc.lower() != "token":
+                    action, token, target_url = parsed
+                    if action != "token":
                         return False
                     
-                    qs = urllib.parse.parse_qs(parsed.query or "")
-                    token = (qs.get("token") or [None])[0]
-                    target_url = urllib.parse.unquote((qs.get("url") or [None])[0] or "")
-                    
                     if not token or not target_url:
                         logger.error("❌ Missing token or URL in samay:// URL")
                         return False
                     
                     # Basic allowlist for security
-                    if not (target_url.startswith("http://") or target_url.startswith("https://") or 
-                           target_url.startswith("http://localhost") or target_url.startswith("http://127.0.0.1")):
-                        logger.error(f"❌ Invalid target URL: {target_url}")
+                    if not target_url.startswith(("http://", "https://")):
+                        logger.error("❌ Invalid target URL: %s", target_url)
                         return False
                     
                     save_token_url(token, target_url)
                     return True
                 except Exception as e:
-                    logger.exception(f"❌ Error parsing/storing samay:// URL: {e}")
+                    logger.exception("❌ Error parsing/storing samay:// URL: %s", e)
                     return False
             
             class UrlOpenFilter(QObject):
@@ -643,20 +682,17 @@ def run(manager: Manager, testing: bool = False, samay_url: Optional[str] = None
                             pass
                         
                         if url and url.startswith("samay://"):
-                            logger.info(f"🔗 Received samay:// URL via QEvent.FileOpen: {url}")
+                            logger.info("🔗 Received samay:// URL via QEvent.FileOpen: %s", redact_samay_url(url))
                             handled = parse_and_store(url)
                             if handled:
                                 logger.info("✅ Successfully processed samay:// URL")
-                                # Immediately refresh tray menu if instance exists
-                                try:
-                                    from PyQt6.QtCore import QTimer
+                                if current_tray_icon is not None:
                                     # Event loop deferral timer - ensures URL handling happens after current event processing
-                                    QTimer.singleShot(0, lambda: (current_tray_icon and current_tray_icon.handle_samay_url(url)))
-                                except Exception:
-                                    pass
-                                # Fallback: leave pending URL too
-                                global pending_samay_url
-                                pending_samay_url = url
+                                    QTimer.singleShot(0, partial(current_tray_icon.handle_samay_url, url))
+                                else:
+                                    # No tray yet, TrayIcon.__init__ picks it up
+                                    global pending_samay_url
+                                    pending_samay_url = url
                             return True  # Consume the event
                     return super().eventFilter(obj, event)
             
@@ -667,28 +703,33 @@ def run(manager: Manager, testing: bool = False, samay_url: Optional[str] = None
             
             # Handle URL passed as command line argument (extra resilience)
             if len(sys.argv) > 1 and sys.argv[1].startswith("samay://"):
-                logger.info(f"🔗 Processing samay:// URL from command line: {sys.argv[1]}")
+                logger.info("🔗 Processing samay:// URL from command line: %s", redact_samay_url(sys.argv[1]))
                 parse_and_store(sys.argv[1])
                 
         except Exception as e:
-            logger.exception(f"❌ Failed to register QEvent.FileOpen filter: {e}")
+            logger.exception("❌ Failed to register QEvent.FileOpen filter: %s", e)
 
     # This is needed for the icons to get picked up with PyInstaller
     scriptdir = Path(__file__).parent
 
-    # When run from source:
-    #   __file__ is aw_qt/trayicon.py
-    #   scriptdir is ./aw_qt
-    #   logodir is ./media/logo
-    QtCore.QDir.addSearchPath("icons", str(scriptdir.parent / "media/logo/"))
-
-    # When run from .app:
-    #   __file__ is ./Contents/MacOS/aw-qt
-    #   scriptdir is ./Contents/MacOS
-    #   logodir is ./Contents/Resources/aw_qt/media/logo
-    QtCore.QDir.addSearchPath(
-        "icons", str(scriptdir.parent.parent / "Resources/aw_qt/media/logo/")
-    )
+    logodirs = [
+        # When run from source:
+        #   __file__ is aw_qt/trayicon.py
+        #   scriptdir is ./aw_qt
+        #   logodir is ./media/logo
+        str(scriptdir.parent / "media/logo/"),
+        # When run from .app:
+        #   __file__ is ./Contents/MacOS/aw-qt
+        #   scriptdir is ./Contents/MacOS
+        #   logodir is ./Contents/Resources/aw_qt/media/logo
+        str(scriptdir.parent.parent / "Resources/aw_qt/media/logo/"),
+    ]
+    # Every "icons:" lookup scans these, so only add the one(s) that exist, and only once
+    existing = set(QtCore.QDir.searchPaths("icons"))
+    for logodir in logodirs:
+        if logodir not in existing and os.path.isdir(logodir):
+            QtCore.QDir.addSearchPath("icons", logodir)
+            existing.add(logodir)
 
     # logger.info(f"search paths: {QtCore.QDir.searchPaths('icons')}")
 
@@ -696,7 +737,14 @@ def run(manager: Manager, testing: bool = False, samay_url: Optional[str] = None
     signal.signal(signal.SIGINT, lambda *args: exit(manager))
     # Ensure cleanup happens on SIGTERM
     signal.signal(signal.SIGTERM, lambda *args: exit(manager))
-
+    # Python handlers only run once the interpreter regains control from the Qt event loop,
+    # so have the signal write to a socket that wakes the loop instead of polling with a timer
+    signal_rsock, signal_wsock = socket.socketpair()
+    signal_rsock.setblocking(False)
+    signal_wsock.setblocking(False)
+    signal.set_wakeup_fd(signal_wsock.fileno())
+    signal_notifier = QSocketNotifier(signal_rsock.fileno(), QSocketNotifier.Type.Read)
+    signal_notifier.activated.connect(lambda *args: _drain_socket(signal_rsock))
 
     # root widget
     widget = QWidget()
@@ -721,7 +769,7 @@ def run(manager: Manager, testing: bool = False, samay_url: Optional[str] = None
 
     # Handle samay:// URL if provided
     if samay_url:
-        logger.info(f"🔗 Processing samay:// URL in trayicon: {samay_url}")
+        logger.info("🔗 Processing samay:// URL in trayicon: %s", redact_samay_url(samay_url))
         trayIcon.handle_samay_url(samay_url)
 
     QApplication.setQuitOnLastWindowClosed(False)
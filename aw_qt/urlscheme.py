@@ -0,0 +1,38 @@
+import re
+from typing import Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote_plus
+
+# Fast path for the only URL the login page sends: samay://token?token=...&url=...
+# Only the scheme and action are case-insensitive, like they are for urlsplit() below.
+_SAMAY_TOKEN_RE = re.compile(
+    r"^(?i:samay://token)/?\?"
+    r"(?=(?:[^#]*?&)??token=(?P<token>[^&#]+))"
+    r"(?=(?:[^#]*?&)??url=(?P<url>[^&#]+))"
+)
+
+
+def redact_samay_url(url: Optional[str]) -> Optional[str]:
+    """Drops the query of a samay:// URL for logging, it carries the auth token"""
+    if not url or "?" not in url:
+        return url
+    return url.split("?", 1)[0] + "?…"
+
+
+def parse_samay_url(
+    url: str,
+) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    """Returns ``(action, token, api_url)`` for a samay:// URL, or None for any other scheme"""
+    m = _SAMAY_TOKEN_RE.match(url)
+    if m:
+        return "token", unquote_plus(m["token"]), unquote_plus(m["url"])
+
+    # Slow path for anything unusual (other actions, missing params)
+    parsed = urlsplit(url)
+    if parsed.scheme != "samay":
+        return None
+    qs = parse_qs(parsed.query)
+    return (
+        parsed.netloc.lower(),
+        (qs.get("token") or [None])[0],
+        (qs.get("url") or [None])[0],
+    )
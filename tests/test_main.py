@@ -0,0 +1,23 @@
+import pytest
+
+from aw_qt.main import _parse_modules
+
+
+@pytest.mark.parametrize(
+    "arg, expected",
+    [
+        (None, None),
+        ("", None),
+        ("none", []),
+        ("None", []),
+        ("aw-watcher-afk", ["aw-watcher-afk"]),
+        ("aw-server,aw-watcher-afk", ["aw-server", "aw-watcher-afk"]),
+        (" aw-server , aw-watcher-afk ", ["aw-server", "aw-watcher-afk"]),
+        ("aw-server,none,aw-watcher-afk", ["aw-server", "aw-watcher-afk"]),
+        ("none,aw-server", ["aw-server"]),
+        ("aw-server,,aw-watcher-afk,", ["aw-server", "aw-watcher-afk"]),
+        (" , none ,", []),
+    ],
+)
+def test_parse_modules(arg, expected):
+    assert _parse_modules(arg) == expected
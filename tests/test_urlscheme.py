@@ -0,0 +1,63 @@
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from aw_qt.urlscheme import _SAMAY_TOKEN_RE, parse_samay_url, redact_samay_url
+
+
+def _parse_slow(url):
+    parsed = urlsplit(url)
+    qs = parse_qs(parsed.query)
+    return (
+        parsed.netloc.lower(),
+        (qs.get("token") or [None])[0],
+        (qs.get("url") or [None])[0],
+    )
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "samay://token?token=abc&url=https://api.example.com",
+        "samay://token/?url=https://api.example.com&token=abc",
+        "SAMAY://Token?token=abc&url=https://api.example.com",
+        "samay://token?TOKEN=abc&URL=https://api.example.com",
+        "samay://token?token=abc&token=def&url=https://api.example.com",
+        "samay://token?xtoken=zzz&token=abc&url=https://api.example.com",
+        "samay://token?token=a%2Bb+c%20d&url=https%3A%2F%2Fapi.example.com%2Fv1",
+        "samay://token?token=abc&url=https://api.example.com#token=def",
+        "samay://token?token=&url=https://api.example.com",
+        "samay://token?token=abc",
+    ],
+)
+def test_fast_path_agrees_with_slow_path(url):
+    assert parse_samay_url(url) == _parse_slow(url)
+
+
+def test_fast_path_is_used_for_login_url():
+    assert _SAMAY_TOKEN_RE.match("samay://token?token=abc&url=https://api.example.com")
+    assert not _SAMAY_TOKEN_RE.match("samay://token?TOKEN=abc&URL=https://api.example.com")
+
+
+def test_duplicate_keys_use_first_value():
+    url = "samay://token?token=first&url=https://a.example.com&token=second&url=https://b.example.com"
+    assert parse_samay_url(url) == ("token", "first", "https://a.example.com")
+
+
+def test_percent_and_plus_decoding():
+    url = "samay://token?token=a%2Bb+c%3D&url=https%3A%2F%2Fapi.example.com%2Fv1%3Fx%3D1"
+    assert parse_samay_url(url) == ("token", "a+b c=", "https://api.example.com/v1?x=1")
+
+
+def test_other_action():
+    assert parse_samay_url("samay://Logout") == ("logout", None, None)
+
+
+def test_other_scheme():
+    assert parse_samay_url("https://token?token=abc&url=https://api.example.com") is None
+
+
+def test_redact():
+    assert redact_samay_url("samay://token?token=abc&url=x") == "samay://token?…"
+    assert redact_samay_url("samay://logout") == "samay://logout"
+    assert redact_samay_url(None) is None